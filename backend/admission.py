@@ -0,0 +1,151 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+# Weight of the newest sample in the service time moving average
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a request can't be admitted within its deadline."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Overloaded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds (at least 1)."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, deadline-ordered wait queue.
+
+    At most `limit` calls run at once. Others wait, earliest deadline
+    first, in a queue of at most `max_queue`. A request is rejected
+    upfront if the queue is full or if its estimated wait (queue position x
+    average service time / limit) would overrun its deadline. A waiter whose
+    deadline passes is rejected instead of being started late.
+    """
+
+    def __init__(self, limit: int, max_queue: int, slo_seconds: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.slo_seconds = slo_seconds
+        self.in_flight = 0
+        self._waiters: list[tuple[float, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._service_time = 1.0  # Seconds, refined as calls complete
+        self._admitted = 0
+        self._rejected = 0
+        self._waits: deque[float] = deque(maxlen=200)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def estimated_wait(self) -> float:
+        """Seconds a new request would wait for a slot."""
+        if self.in_flight < self.limit and not self.queue_depth:
+            return 0.0
+        return (self.queue_depth + 1) * self._service_time / self.limit
+
+    def check(self):
+        """
+        Raise Overloaded now if a new request would be shed, so callers can
+        refuse work before doing anything they'd have to undo.
+        """
+        estimate = self.estimated_wait()
+        if self.queue_depth >= self.max_queue or estimate > self.slo_seconds:
+            self._rejected += 1
+            raise Overloaded(retry_after=estimate)
+
+    @asynccontextmanager
+    async def slot(self, deadline: Optional[float] = None):
+        """Hold a concurrency slot; raises Overloaded if one isn't free in time."""
+        arrived = time.monotonic()
+        deadline = deadline or arrived + self.slo_seconds
+
+        if self.in_flight < self.limit and not self.queue_depth:
+            self.in_flight += 1
+        else:
+            await self._wait_for_slot(arrived, deadline)
+
+        self._admitted += 1
+        self._waits.append(time.monotonic() - arrived)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._service_time += SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+            self._release()
+
+    async def _wait_for_slot(self, arrived: float, deadline: float):
+        estimate = self.estimated_wait()
+        if self.queue_depth >= self.max_queue or arrived + estimate > deadline:
+            self._rejected += 1
+            raise Overloaded(retry_after=estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (deadline, next(self._sequence), future))
+        try:
+            done, _ = await asyncio.wait({future}, timeout=deadline - arrived)
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+
+        if not done:
+            self._abandon(future)
+            self._rejected += 1
+            raise Overloaded(retry_after=self.estimated_wait())
+
+        future.result()  # Raises Overloaded if the deadline passed in the queue
+
+    def _abandon(self, future: asyncio.Future):
+        if future.done() and not future.cancelled() and future.exception() is None:
+            # A slot was handed over just as we gave up; pass it on
+            self._release()
+        else:
+            future.cancel()
+
+    def _release(self):
+        self.in_flight -= 1
+        now = time.monotonic()
+        while self._waiters:
+            deadline, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # Timed out or cancelled while queued
+            if deadline < now:
+                self._rejected += 1
+                future.set_exception(Overloaded(retry_after=self.estimated_wait()))
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+            break
+
+    def stats(self) -> dict:
+        """Queue depth, slot usage and wait times."""
+        waits = sorted(self._waits)
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "avg_service_ms": round(self._service_time * 1000, 1),
+            "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "p95_wait_ms": (
+                round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0
+            ),
+            "estimated_wait_ms": round(self.estimated_wait() * 1000, 1),
+        }
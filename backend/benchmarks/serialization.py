@@ -0,0 +1,118 @@
+"""
+Microbenchmark: JSON serialization cost per endpoint, before and after orjson.
+
+"before" mirrors FastAPI's default path (response-model revalidation where the
+route declares one, jsonable_encoder, then stdlib json.dumps).
+"after" mirrors the current path (ORJSONResponse, skipping the encoder on the
+hot endpoints that return a response directly).
+
+Run from the backend directory:
+    python -m benchmarks.serialization
+"""
+
+import json
+import timeit
+from datetime import datetime
+from uuid import uuid4
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from models import AnalyticsStats, ChatResponse
+
+ITERATIONS = 20000
+
+
+def stdlib_dumps(content) -> bytes:
+    """Same settings as fastapi.responses.JSONResponse.render."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def sample_payloads() -> dict:
+    now = datetime.utcnow()
+    recent_events = [
+        {
+            "id": str(uuid4()),
+            "session_id": f"session_{i}",
+            "event_type": "page_view",
+            "page_path": "/",
+            "section_name": None,
+            "created_at": now.isoformat(),
+        }
+        for i in range(10)
+    ]
+    return {
+        "track": {"success": True, "message": "Counter updated"},
+        "visitors/live": {
+            "active_visitors": 12,
+            "total_views": 48213,
+            "timestamp": now.isoformat(),
+        },
+        "stats": {
+            "total_visitors": 1534,
+            "live_visitors": 12,
+            "total_page_views": 48213,
+            "popular_sections": [
+                {"name": name, "views": 100 - i}
+                for i, name in enumerate(["hero", "projects", "skills", "about", "contact"])
+            ],
+            "recent_events": recent_events,
+        },
+        "chat/message": {
+            "message": "Kamalesh specializes in FastAPI and Next.js. " * 8,
+            "conversation_id": str(uuid4()),
+            "created_at": now,
+        },
+        "ws/system": {
+            "type": "stats",
+            "timestamp": now.isoformat(),
+            "cpu": 23.4,
+            "memory": 41.2,
+            "requests_per_sec": 17,
+            "active_connections": 3,
+            "status": "healthy",
+        },
+    }
+
+
+def main():
+    payloads = sample_payloads()
+    models = {"stats": AnalyticsStats, "chat/message": ChatResponse}
+
+    cases = {}
+    for name, payload in payloads.items():
+        model = models.get(name)
+        if model is not None:
+            # Routes with a response_model still validate, then encode
+            before = lambda p=payload, m=model: stdlib_dumps(
+                jsonable_encoder(m.model_validate(p))
+            )
+            after = lambda p=payload, m=model: orjson.dumps(
+                jsonable_encoder(m.model_validate(p))
+            )
+        elif name == "ws/system":
+            before = lambda p=payload: json.dumps(p)
+            after = lambda p=payload: orjson.dumps(p).decode()
+        else:
+            # Hot endpoints now return ORJSONResponse directly
+            before = lambda p=payload: stdlib_dumps(jsonable_encoder(p))
+            after = lambda p=payload: orjson.dumps(p)
+        cases[name] = (before, after)
+
+    print(f"{'endpoint':<16}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, (before, after) in cases.items():
+        before_us = timeit.timeit(before, number=ITERATIONS) / ITERATIONS * 1e6
+        after_us = timeit.timeit(after, number=ITERATIONS) / ITERATIONS * 1e6
+        print(
+            f"{name:<16}{before_us:>14.2f}{after_us:>14.2f}{before_us / after_us:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Microbenchmark: user-agent classification cost per tracked event.
+
+"cold" classifies every string once with an empty cache (substring scan).
+"warm" replays realistic traffic where a few User-Agents repeat (cache hits).
+
+Run from the backend directory:
+    python -m benchmarks.user_agents
+"""
+
+import random
+import timeit
+
+from user_agents import classify_user_agent
+
+ITERATIONS = 100000
+
+SAMPLE_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (iPad; CPU OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:131.0) Gecko/20100101 Firefox/131.0",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "Mozilla/5.0 (compatible; bingbot/2.0; +http://www.bing.com/bingbot.htm)",
+    "facebookexternalhit/1.1 (+http://www.facebook.com/externalhit_uatext.php)",
+    "python-requests/2.31.0",
+]
+
+
+def main():
+    unique = [f"{agent} build/{i}" for i, agent in enumerate(SAMPLE_USER_AGENTS * 1000)]
+
+    classify_user_agent.cache_clear()
+    cold_us = timeit.timeit(
+        lambda: [classify_user_agent(agent) for agent in unique], number=1
+    ) / len(unique) * 1e6
+
+    traffic = random.choices(SAMPLE_USER_AGENTS, k=ITERATIONS)
+    classify_user_agent.cache_clear()
+    warm_us = timeit.timeit(
+        lambda: [classify_user_agent(agent) for agent in traffic], number=1
+    ) / len(traffic) * 1e6
+
+    print(f"cold (uncached): {cold_us:.2f} us/event")
+    print(f"warm (cached):   {warm_us:.2f} us/event")
+    print(classify_user_agent.cache_info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# State below is per-process. With several workers, a retry routed to
+# another worker is not deduplicated, but each worker stays consistent.
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+        # Shield so one caller disconnecting doesn't cancel the shared call
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _finish(self, key: str, future: asyncio.Future):
+        self._calls.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # Mark retrieved even if every caller went away
+
+
+class KeyedLock:
+    """One asyncio.Lock per key, dropped once nobody holds or waits on it."""
+
+    def __init__(self):
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._users: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                del self._locks[key]
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -1,6 +1,8 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 from typing import List
+import os
+import tempfile
 
 
 class Settings(BaseSettings):
@@ -23,14 +25,50 @@ class Settings(BaseSettings):
     backend_url: str = "http://localhost:8000"
     environment: str = "development"
 
+    # Admin (required for data exports; exports are disabled when empty)
+    admin_api_key: str = ""
+
     # Rate Limiting
     rate_limit_enabled: bool = True
     contact_form_rate_limit: str = "3/hour"
 
+    # Analytics Batching
+    analytics_max_batch_size: int = 50
+    analytics_max_batch_bytes: int = 65536  # Limit applies after gzip decoding
+
+    # Bot Filtering (drop crawler traffic before any database write)
+    bot_filtering_enabled: bool = True
+
+    # Popular Sections Sketch
+    section_sketch_capacity: int = 64  # Counters kept per day
+    section_sketch_flush_interval: float = 60.0  # Seconds between persists
+
+    # Monitor Bus (Unix socket shared by uvicorn workers on one host)
+    monitor_bus_path: str = os.path.join(tempfile.gettempdir(), "portfolio-monitor.sock")
+
+    # System Monitor Tick (compact frames back off while stats are unchanged)
+    monitor_tick_seconds: float = 2.0
+    monitor_max_tick_seconds: float = 16.0
+    monitor_change_tolerance: float = 0.05  # Relative change ignored as jitter
+
+    # Live Visitor Push (visitors topic on /ws/system)
+    visitor_push_interval: float = 5.0  # Seconds between live count checks
+
+    # Request Tracing
+    request_tracing_enabled: bool = True
+    slow_request_ms: float = 1000.0
+    repeated_query_threshold: int = 5  # Warn when one query shape repeats more
+
     # AI Configuration
     ai_model: str = "mistral-small-latest"  # Mistral's free tier model
     ai_temperature: float = 0.7
     ai_max_tokens: int = 500
+    chat_idempotency_ttl: int = 600  # Seconds a finished turn is replayed for
+
+    # AI Admission Control
+    ai_max_concurrency: int = 4  # Concurrent upstream calls per worker
+    ai_max_queue: int = 16  # Requests allowed to wait for a slot
+    ai_queue_slo: float = 10.0  # Max seconds a request may wait before 503
 
     class Config:
         env_file = ".env"
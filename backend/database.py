@@ -1,12 +1,15 @@
-from supabase import create_client, Client
+from supabase import create_client
 from config import get_settings
+from instrumentation import TracedClient
 
 settings = get_settings()
 
-# Initialize Supabase client
-supabase: Client = create_client(settings.supabase_url, settings.supabase_service_key)
+# Initialize Supabase client (wrapped so queries show up in request traces)
+supabase = TracedClient(
+    create_client(settings.supabase_url, settings.supabase_service_key)
+)
 
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> TracedClient:
     """Get Supabase client instance."""
     return supabase
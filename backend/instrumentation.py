@@ -0,0 +1,201 @@
+from fastapi import Request
+from contextvars import ContextVar
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, List, Optional
+import time
+
+import httpx
+
+from config import get_settings
+
+settings = get_settings()
+
+# Query builder methods whose first argument is a column name (safe to keep in
+# a query shape). Values are never recorded, so shapes stay low-cardinality.
+COLUMN_METHODS = {
+    "select",
+    "eq",
+    "neq",
+    "gt",
+    "gte",
+    "lt",
+    "lte",
+    "like",
+    "ilike",
+    "is_",
+    "in_",
+    "contains",
+    "order",
+}
+
+
+@dataclass
+class TracedCall:
+    """A single database or upstream HTTP call made while serving a request."""
+
+    kind: str  # "db" or "upstream"
+    target: str  # Table / RPC name or upstream host
+    shape: str  # Call without its values, used for N+1 detection
+    duration_ms: float
+
+
+class RequestTrace:
+    """Calls recorded for the request currently being served."""
+
+    def __init__(self):
+        self.calls: List[TracedCall] = []
+
+    def record(self, kind: str, target: str, shape: str, duration_ms: float):
+        self.calls.append(TracedCall(kind, target, shape, duration_ms))
+
+    def summary(self, kind: str) -> tuple[int, float]:
+        """Return (count, total duration in ms) for one kind of call."""
+        calls = [call for call in self.calls if call.kind == kind]
+        return len(calls), sum(call.duration_ms for call in calls)
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Return query shapes that ran more than `threshold` times."""
+        counts = Counter(call.shape for call in self.calls)
+        return [(shape, n) for shape, n in counts.most_common() if n > threshold]
+
+    def server_timing(self, total_ms: float) -> str:
+        """Format the trace as a Server-Timing header value."""
+        parts = []
+        for kind in ("db", "upstream"):
+            count, duration = self.summary(kind)
+            if count:
+                parts.append(f'{kind};dur={duration:.1f};desc="{count} calls"')
+        parts.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar(
+    "request_trace", default=None
+)
+
+
+def get_current_trace() -> Optional[RequestTrace]:
+    """Get the trace for the current request, if any."""
+    return _current_trace.get()
+
+
+def record_call(kind: str, target: str, shape: str, duration_ms: float):
+    """Record a call on the current request's trace (no-op outside a request)."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(kind, target, shape, duration_ms)
+
+
+class TracedQuery:
+    """Proxy around a Supabase query builder that times `execute()`."""
+
+    def __init__(self, builder: Any, target: str, operations: List[str]):
+        self._builder = builder
+        self._target = target
+        self._operations = operations
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def method(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            operation = name
+            if name in COLUMN_METHODS and args and isinstance(args[0], str):
+                operation = f"{name}({args[0]})"
+            if hasattr(result, "execute"):
+                return TracedQuery(
+                    result, self._target, self._operations + [operation]
+                )
+            return result
+
+        return method
+
+    def execute(self):
+        start = time.perf_counter()
+        try:
+            return self._builder.execute()
+        finally:
+            shape = ".".join([self._target] + self._operations)
+            record_call(
+                "db", self._target, shape, (time.perf_counter() - start) * 1000
+            )
+
+
+class TracedClient:
+    """Supabase client wrapper that records every query on the request trace."""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, table_name: str) -> TracedQuery:
+        return TracedQuery(self._client.table(table_name), table_name, [])
+
+    def from_(self, table_name: str) -> TracedQuery:
+        return self.table(table_name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> TracedQuery:
+        return TracedQuery(self._client.rpc(fn, params or {}), f"rpc:{fn}", [])
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records outbound calls on the request trace."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            return await self._transport.handle_async_request(request)
+        finally:
+            host = request.url.host
+            record_call(
+                "upstream",
+                host,
+                f"{request.method} {host}{request.url.path}",
+                (time.perf_counter() - start) * 1000,
+            )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+async def trace_requests(request: Request, call_next):
+    """
+    HTTP middleware that traces DB/upstream calls per request.
+    - Adds a Server-Timing header
+    - Logs slow requests
+    - Warns when the same query shape repeats (likely N+1)
+    """
+    trace = RequestTrace()
+    token = _current_trace.set(trace)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current_trace.reset(token)
+
+    total_ms = (time.perf_counter() - start) * 1000
+    response.headers["Server-Timing"] = trace.server_timing(total_ms)
+
+    route = f"{request.method} {request.url.path}"
+
+    if total_ms >= settings.slow_request_ms:
+        db_count, db_ms = trace.summary("db")
+        upstream_count, upstream_ms = trace.summary("upstream")
+        print(
+            f"🐢 Slow request: {route} took {total_ms:.0f}ms "
+            f"(db: {db_count} calls/{db_ms:.0f}ms, "
+            f"upstream: {upstream_count} calls/{upstream_ms:.0f}ms)"
+        )
+
+    for shape, count in trace.repeated_shapes(settings.repeated_query_threshold):
+        print(f"⚠️ Possible N+1 in {route}: {shape} ran {count} times")
+
+    return response
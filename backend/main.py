@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -8,7 +9,8 @@ import asyncio
 from contextlib import asynccontextmanager
 
 from config import get_settings
-from routes import chat, analytics, contact, cleanup, monitor
+from instrumentation import trace_requests
+from routes import chat, analytics, contact, cleanup, monitor, export
 
 # Initialize settings
 settings = get_settings()
@@ -57,11 +59,21 @@ async def lifespan(app: FastAPI):
 
     # Start System Monitor (Engine Room)
     # We import inside to avoid circular deps if any, though here it's fine.
-    from routes.monitor import system_stats_generator
+    from routes.monitor import bus, system_stats_generator, visitor_stats_generator
+
+    bus_task = asyncio.create_task(bus.run())
 
     monitor_task = asyncio.create_task(system_stats_generator())
     print("🖥️  Started Engine Room system monitor")
 
+    visitors_task = asyncio.create_task(visitor_stats_generator())
+    print("👥 Started live visitor push")
+
+    from routes.analytics import section_views_sync_task
+
+    sections_task = asyncio.create_task(section_views_sync_task())
+    print("📊 Started popular sections sketch sync")
+
     yield
 
     # Shutdown: Cancel cleanup task
@@ -73,6 +85,18 @@ async def lifespan(app: FastAPI):
         monitor_task.cancel()
         print("🛑 Stopped system monitor")
 
+    if visitors_task:
+        visitors_task.cancel()
+        print("🛑 Stopped live visitor push")
+
+    if sections_task:
+        sections_task.cancel()
+        print("🛑 Stopped popular sections sketch sync")
+
+    if bus_task:
+        bus_task.cancel()
+        print("🛑 Stopped monitor bus")
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -82,6 +106,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # orjson instead of stdlib json
 )
 
 # Add rate limiter to app state
@@ -97,6 +122,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Trace DB/upstream calls per request (Server-Timing, slow and N+1 logs)
+if settings.request_tracing_enabled:
+    app.middleware("http")(trace_requests)
+
 # Add trusted host middleware for production
 if settings.environment == "production":
     app.add_middleware(
@@ -109,6 +138,7 @@ app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 app.include_router(contact.router, prefix="/api/contact", tags=["Contact"])
 app.include_router(cleanup.router, prefix="/api/cleanup", tags=["Cleanup"])
+app.include_router(export.router, prefix="/api/export", tags=["Export"])
 
 app.include_router(
     monitor.router, tags=["Monitor"]
@@ -141,4 +171,5 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.environment == "development",
+        ws_per_message_deflate=True,  # Compress /ws/system frames when negotiated
     )
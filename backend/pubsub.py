@@ -0,0 +1,186 @@
+import asyncio
+import os
+import socket
+from typing import Awaitable, Callable, Optional
+
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, run every worker standalone
+    fcntl = None
+
+# on_message(topic, kind, frame) - frame is an already-serialized JSON string
+MessageHandler = Callable[[str, str, str], Awaitable[None]]
+# presence() -> {"connections": int, "topics": [str, ...]} for this worker
+PresenceReporter = Callable[[], dict]
+# replay() -> [(topic, kind, frame), ...] sent to a worker when it joins
+ReplaySource = Callable[[], list[tuple[str, str, str]]]
+
+# Drop a worker whose unread backlog grows past this instead of buffering forever
+MAX_WORKER_BACKLOG = 1024 * 1024
+RETRY_DELAY = 0.5
+HEARTBEAT_INTERVAL = 2.0
+
+
+def _encode_line(topic: str, kind: str, frame: str) -> bytes:
+    return f"{topic}\t{kind}\t{frame}\n".encode()
+
+
+class LocalBus:
+    """
+    Host-local pub/sub over a Unix-domain socket, shared by uvicorn workers.
+
+    Workers elect a single producer by taking an exclusive flock on
+    `<path>.lock`. The producer serves the socket, runs the generators and
+    relays every published frame to the other workers. The others subscribe,
+    fan frames out to their own WebSockets and report their presence (open
+    sockets and subscribed topics). If the producer dies, its lock is
+    released and the next worker to grab it takes over. A worker that joins
+    late first receives the producer's `replay()` frames (current state).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_message: MessageHandler,
+        presence: PresenceReporter,
+        replay: Optional[ReplaySource] = None,
+    ):
+        self.path = path
+        self.on_message = on_message
+        self.presence = presence
+        self.replay = replay
+        self.is_producer = False
+        self._lock_fd: Optional[int] = None
+        self._workers: dict[asyncio.StreamWriter, dict] = {}
+
+    @property
+    def supported(self) -> bool:
+        return fcntl is not None and hasattr(socket, "AF_UNIX")
+
+    def _presences(self) -> list[dict]:
+        return [self.presence(), *self._workers.values()]
+
+    def total_connections(self) -> int:
+        """Open WebSockets across all workers (accurate on the producer)."""
+        return sum(presence.get("connections", 0) for presence in self._presences())
+
+    def has_subscribers(self, topic: str) -> bool:
+        """Whether any worker has a socket on `topic` (accurate on the producer)."""
+        return any(topic in presence.get("topics", ()) for presence in self._presences())
+
+    async def run(self):
+        """Elect a producer, then serve or subscribe until cancelled."""
+        if not self.supported:
+            self.is_producer = True
+            print("ℹ️ Monitor bus unavailable on this platform, running standalone")
+            return
+
+        try:
+            while True:
+                if self._try_lock():
+                    try:
+                        await self._serve()
+                    except OSError as e:
+                        print(f"❌ Monitor bus error: {e}")
+                        self._release()
+                        await asyncio.sleep(RETRY_DELAY)
+                else:
+                    try:
+                        await self._subscribe()
+                    except (ConnectionError, FileNotFoundError, OSError):
+                        pass
+                    await asyncio.sleep(RETRY_DELAY)
+        finally:
+            self._release()
+
+    async def publish(self, topic: str, kind: str, frame: str):
+        """Deliver a frame locally and relay it to every other worker."""
+        await self.on_message(topic, kind, frame)
+
+        if not self._workers:
+            return
+
+        line = _encode_line(topic, kind, frame)
+        for writer in list(self._workers):
+            if writer.transport.get_write_buffer_size() > MAX_WORKER_BACKLOG:
+                print("⚠️ Dropping slow monitor bus subscriber")
+                self._workers.pop(writer, None)
+                writer.close()
+                continue
+            writer.write(line)
+
+    def _try_lock(self) -> bool:
+        if self._lock_fd is None:
+            self._lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _release(self):
+        self.is_producer = False
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # Also releases the flock
+            self._lock_fd = None
+
+    async def _serve(self):
+        # The lock guarantees no live producer owns the socket, so it's stale
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        server = await asyncio.start_unix_server(self._handle_worker, path=self.path)
+        self.is_producer = True
+        print(f"📡 Monitor bus producer on {self.path} (pid {os.getpid()})")
+        try:
+            await asyncio.Future()  # Serve until cancelled
+        finally:
+            server.close()
+            for writer in self._workers:
+                writer.close()
+            self._workers.clear()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    async def _handle_worker(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        self._workers[writer] = {}
+        # Bring the new worker up to date before it sees any later frame
+        for topic, kind, frame in self.replay() if self.replay else ():
+            writer.write(_encode_line(topic, kind, frame))
+        try:
+            # Workers only send presence heartbeats
+            while line := await reader.readline():
+                if writer not in self._workers:
+                    break  # Dropped as a slow subscriber
+                try:
+                    self._workers[writer] = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    pass
+        except ConnectionError:
+            pass
+        finally:
+            self._workers.pop(writer, None)
+            writer.close()
+
+    async def _subscribe(self):
+        reader, writer = await asyncio.open_unix_connection(
+            self.path, limit=MAX_WORKER_BACKLOG
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(writer))
+        try:
+            while line := await reader.readline():
+                topic, kind, frame = line.decode().rstrip("\n").split("\t", 2)
+                await self.on_message(topic, kind, frame)
+        finally:
+            heartbeat.cancel()
+            writer.close()
+
+    async def _heartbeat(self, writer: asyncio.StreamWriter):
+        while True:
+            writer.write(orjson.dumps(self.presence()) + b"\n")
+            await writer.drain()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
@@ -1,59 +1,249 @@
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
 from datetime import datetime, timedelta
-from typing import Dict
-
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+import asyncio
+import json
+import os
+import socket
+import zlib
+
+from config import get_settings
 from database import get_supabase_client
 from models import AnalyticsEvent, AnalyticsStats
+from sketches import DailyTopK, SpaceSaving
+from user_agents import classify_user_agent
 
 router = APIRouter()
+settings = get_settings()
 supabase = get_supabase_client()
 
+_event_batch_adapter = TypeAdapter(List[AnalyticsEvent])
 
-@router.post("/track")
-async def track_event(event: AnalyticsEvent, request: Request):
+# Events accepted / dropped as bots at ingestion (per worker, since startup)
+ingestion_counters: Counter = Counter()
+
+# Bot events not yet added to the persisted filtered_bot_events counter.
+# They're written along with the next real events, so bot-only requests
+# don't touch the database at all.
+unpersisted_bot_events = 0
+
+# Popular sections over the last 7 days, updated as section views are tracked
+section_views = DailyTopK(window_days=7, capacity=settings.section_sketch_capacity)
+
+
+async def _read_batch_body(request: Request) -> bytes:
     """
-    Track analytics with minimal storage - only increment counters.
+    Read the request body, rejecting it as soon as it exceeds the batch
+    size limit instead of buffering an oversized payload first.
+    """
+    max_bytes = settings.analytics_max_batch_bytes
+
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Batch payload too large")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail="Batch payload too large")
+
+    return bytes(body)
+
+
+def _decode_batch_body(body: bytes, content_encoding: str) -> Any:
     """
+    Decode a batch payload sent as JSON, gzip-compressed JSON or a
+    sendBeacon text/plain string.
+    """
+    max_bytes = settings.analytics_max_batch_bytes
+
+    if "gzip" in content_encoding or body[:2] == b"\x1f\x8b":
+        # Bound the inflated size so a small gzip bomb can't exhaust memory
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            body = decompressor.decompress(body, max_bytes + 1)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip payload")
+        if len(body) > max_bytes or decompressor.unconsumed_tail:
+            raise HTTPException(status_code=413, detail="Batch payload too large")
+
     try:
-        # Update active session (for live visitor count)
-        supabase.table("active_sessions").upsert(
-            {
-                "session_id": event.session_id,
-                "last_seen": datetime.utcnow().isoformat(),
-            },
-            on_conflict="session_id",
-        ).execute()
-
-        # Increment total page views counter (only if page_view event)
-        if event.event_type == "page_view":
-            # Get current counter
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Batch payload is not valid JSON")
+
+    # Accept either a bare array or {"events": [...]}
+    if isinstance(payload, dict):
+        payload = payload.get("events")
+
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Batch must be a list of events")
+
+    if len(payload) > settings.analytics_max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.analytics_max_batch_size} events",
+        )
+
+    return payload
+
+
+def _filter_bots(
+    events: List[AnalyticsEvent], request: Request
+) -> Tuple[List[AnalyticsEvent], int]:
+    """
+    Drop bot traffic before any database write and derive device_type
+    server-side. Returns the kept events and the number filtered.
+    """
+    global unpersisted_bot_events
+
+    if not settings.bot_filtering_enabled:
+        return events, 0
+
+    header_user_agent = request.headers.get("user-agent")
+    kept = []
+    for event in events:
+        info = classify_user_agent(header_user_agent or event.user_agent)
+        if info.is_bot:
+            continue
+        event.device_type = info.device_type
+        kept.append(event)
+
+    filtered = len(events) - len(kept)
+    ingestion_counters["accepted"] += len(kept)
+    ingestion_counters["bots_filtered"] += filtered
+    unpersisted_bot_events += filtered
+    return kept, filtered
+
+
+def _apply_events(events: List[AnalyticsEvent]) -> int:
+    """
+    Apply a group of events with one write per table instead of one per event.
+    Returns the number of page views counted.
+    """
+    global unpersisted_bot_events
+
+    if not events:
+        return 0  # Bot-only request: nothing to write
+
+    now = datetime.utcnow().isoformat()
+
+    # Update active sessions (for live visitor count) - one row per session
+    session_ids = dict.fromkeys(event.session_id for event in events)
+    supabase.table("active_sessions").upsert(
+        [{"session_id": session_id, "last_seen": now} for session_id in session_ids],
+        on_conflict="session_id",
+    ).execute()
+
+    for event in events:
+        if event.event_type == "section_view" and event.section_name:
+            section_views.record(event.section_name)
+
+    # Increment counters once for the whole group, catching up on bot events
+    # filtered since the last write
+    page_views = sum(1 for event in events if event.event_type == "page_view")
+    bots_filtered, unpersisted_bot_events = unpersisted_bot_events, 0
+    increments = {
+        name: count
+        for name, count in (
+            ("total_page_views", page_views),
+            ("filtered_bot_events", bots_filtered),
+        )
+        if count
+    }
+
+    if increments:
+        try:
+            # Get current counters
             counter_result = (
                 supabase.table("analytics_counters")
-                .select("counter_value")
-                .eq("counter_name", "total_page_views")
+                .select("counter_name, counter_value")
+                .in_("counter_name", list(increments))
                 .execute()
             )
 
-            current_value = (
-                counter_result.data[0]["counter_value"] if counter_result.data else 0
-            )
+            current_values = {
+                row["counter_name"]: row["counter_value"]
+                for row in counter_result.data or []
+            }
 
-            # Increment counter
+            # Increment counters
             supabase.table("analytics_counters").upsert(
-                {
-                    "counter_name": "total_page_views",
-                    "counter_value": current_value + 1,
-                    "updated_at": datetime.utcnow().isoformat(),
-                },
+                [
+                    {
+                        "counter_name": name,
+                        "counter_value": current_values.get(name, 0) + count,
+                        "updated_at": now,
+                    }
+                    for name, count in increments.items()
+                ],
                 on_conflict="counter_name",
             ).execute()
+        except Exception:
+            # Keep the bot count for the next write
+            unpersisted_bot_events += bots_filtered
+            raise
+
+    return page_views
+
+
+@router.post("/track")
+async def track_event(event: AnalyticsEvent, request: Request):
+    """
+    Track analytics with minimal storage - only increment counters.
+    """
+    try:
+        events, bots_filtered = _filter_bots([event], request)
+        _apply_events(events)
 
-        return {"success": True, "message": "Counter updated"}
+        # Return a response directly to skip FastAPI's encoder on the hot path
+        if bots_filtered:
+            return ORJSONResponse({"success": True, "message": "Filtered"})
+        return ORJSONResponse({"success": True, "message": "Counter updated"})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error tracking: {str(e)}")
 
 
+@router.post("/track/batch")
+async def track_batch(request: Request):
+    """
+    Track a batch of analytics events in one request.
+    - Accepts a JSON array or {"events": [...]}
+    - Accepts gzip-compressed bodies (Content-Encoding: gzip)
+    - Accepts navigator.sendBeacon text/plain payloads
+    """
+    body = await _read_batch_body(request)
+    payload = _decode_batch_body(body, request.headers.get("content-encoding", ""))
+
+    # Validate the whole batch in one pass
+    try:
+        events = _event_batch_adapter.validate_python(payload)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    try:
+        events, bots_filtered = _filter_bots(events, request)
+        page_views = _apply_events(events)
+
+        return ORJSONResponse(
+            {
+                "success": True,
+                "accepted": len(events),
+                "filtered": bots_filtered,
+                "page_views": page_views,
+            }
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error tracking batch: {str(e)}")
+
+
 @router.get("/stats", response_model=AnalyticsStats)
 async def get_stats():
     """
@@ -105,31 +295,9 @@ async def get_stats():
 
         total_page_views = page_views_result.count or 0
 
-        # Get popular sections (last 7 days)
-        seven_days_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
-
-        sections_result = (
-            supabase.table("analytics_events")
-            .select("section_name")
-            .eq("event_type", "section_view")
-            .gte("created_at", seven_days_ago)
-            .execute()
-        )
-
-        # Count section views
-        section_counts: Dict[str, int] = {}
-        if sections_result.data:
-            for event in sections_result.data:
-                section = event.get("section_name")
-                if section:
-                    section_counts[section] = section_counts.get(section, 0) + 1
-
-        # Sort and format popular sections
+        # Get popular sections (last 7 days) from the in-memory sketch
         popular_sections = [
-            {"name": name, "views": count}
-            for name, count in sorted(
-                section_counts.items(), key=lambda x: x[1], reverse=True
-            )[:5]
+            {"name": name, "views": count} for name, count in section_views.top(5)
         ]
 
         # Get recent events
@@ -155,45 +323,161 @@ async def get_stats():
         raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
 
 
+@router.get("/ingestion")
+async def get_ingestion_stats():
+    """
+    Get bot filtering counters and user-agent cache stats for this worker.
+    """
+    return {
+        "accepted": ingestion_counters["accepted"],
+        "bots_filtered": ingestion_counters["bots_filtered"],
+        "user_agent_cache": classify_user_agent.cache_info()._asdict(),
+    }
+
+
+def fetch_live_counts() -> Dict[str, int]:
+    """
+    Get current live visitor count and total views from counters.
+    """
+    # Get active sessions (last 5 minutes)
+    five_minutes_ago = (datetime.utcnow() - timedelta(minutes=5)).isoformat()
+
+    active_sessions_result = (
+        supabase.table("active_sessions")
+        .select("session_id")
+        .gte("last_seen", five_minutes_ago)
+        .execute()
+    )
+
+    active_visitors = (
+        len(active_sessions_result.data) if active_sessions_result.data else 0
+    )
+
+    # Get total page views from counter
+    counter_result = (
+        supabase.table("analytics_counters")
+        .select("counter_value")
+        .eq("counter_name", "total_page_views")
+        .execute()
+    )
+
+    total_views = counter_result.data[0]["counter_value"] if counter_result.data else 0
+
+    return {"active_visitors": active_visitors, "total_views": total_views}
+
+
 @router.get("/visitors/live")
 async def get_live_visitors():
     """
     Get current live visitor count and total views from counters.
+    Polling fallback for the `visitors` topic on /ws/system.
     """
     try:
-        # Get active sessions (last 5 minutes)
-        five_minutes_ago = (datetime.utcnow() - timedelta(minutes=5)).isoformat()
+        counts = fetch_live_counts()
 
-        active_sessions_result = (
-            supabase.table("active_sessions")
-            .select("session_id")
-            .gte("last_seen", five_minutes_ago)
-            .execute()
+        return ORJSONResponse(
+            {
+                **counts,
+                "timestamp": datetime.utcnow().isoformat(),
+            }
         )
 
-        active_visitors = (
-            len(active_sessions_result.data) if active_sessions_result.data else 0
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error fetching live visitors: {str(e)}"
         )
 
-        # Get total page views from counter
-        counter_result = (
-            supabase.table("analytics_counters")
-            .select("counter_value")
-            .eq("counter_name", "total_page_views")
-            .execute()
-        )
 
-        total_views = (
-            counter_result.data[0]["counter_value"] if counter_result.data else 0
-        )
+def _worker_id() -> str:
+    """Identifies this worker's sketch rows (resolved at call time, after forking)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def fetch_section_view_sketches() -> List[dict]:
+    """Fetch every worker's persisted sketches for the current window."""
+    result = (
+        supabase.table("section_view_sketches")
+        .select("day, worker_id, summary")
+        .gte("day", section_views.window_start().isoformat())
+        .execute()
+    )
+    return result.data or []
+
+
+def store_section_view_sketches(summaries: Dict[str, dict]):
+    """Persist this worker's sketches, one row per day."""
+    if not summaries:
+        return
+
+    worker_id = _worker_id()
+    updated_at = datetime.utcnow().isoformat()
+    supabase.table("section_view_sketches").upsert(
+        [
+            {
+                "day": day,
+                "worker_id": worker_id,
+                "summary": summary,
+                "updated_at": updated_at,
+            }
+            for day, summary in summaries.items()
+        ],
+        on_conflict="day,worker_id",
+    ).execute()
+
+
+async def load_section_views():
+    """
+    Load other workers' persisted section-view sketches for the current
+    window. This worker's own counts are already in memory.
+    """
+    rows = await asyncio.to_thread(fetch_section_view_sketches)
+
+    worker_id = _worker_id()
+    others: Dict[str, SpaceSaving] = {}
+    for row in rows:
+        if row["worker_id"] == worker_id:
+            continue
+        summary = SpaceSaving.from_dict(row["summary"])
+        day = row["day"]
+        others[day] = others[day].merge(summary) if day in others else summary
 
-        return {
-            "active_visitors": active_visitors,
-            "total_views": total_views,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+    for day, summary in others.items():
+        section_views.load(day, summary)
 
+
+async def flush_section_views():
+    """
+    Persist this worker's section-view sketches and pick up counts flushed
+    by other workers. Each worker writes only its own rows, so flushes never
+    race each other; on failure the days are retried on the next flush.
+    """
+    summaries = section_views.take_dirty()
+    try:
+        await asyncio.to_thread(store_section_view_sketches, summaries)
+    except Exception:
+        section_views.mark_dirty(summaries)
+        raise
+
+    await load_section_views()
+
+
+async def section_views_sync_task():
+    """Background task that periodically persists section-view sketches."""
+    try:
+        await load_section_views()
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error fetching live visitors: {str(e)}"
-        )
+        print(f"❌ Section sketch load error: {e}")
+
+    try:
+        while True:
+            await asyncio.sleep(settings.section_sketch_flush_interval)
+            try:
+                await flush_section_views()
+            except Exception as e:
+                print(f"❌ Section sketch flush error: {e}")
+    finally:
+        # Persist what's left on shutdown
+        try:
+            await flush_section_views()
+        except Exception as e:
+            print(f"❌ Section sketch flush error: {e}")
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, HTTPException, Request
+import hashlib
 import httpx
+import orjson
 from datetime import datetime
 from typing import List
 
+from admission import AdmissionController, Overloaded
+from coalescing import KeyedLock, SingleFlight, TTLCache
 from config import get_settings
 from database import get_supabase_client
+from instrumentation import TracingTransport
 from models import ChatMessage, ChatResponse, MessageHistory
 
 router = APIRouter()
@@ -15,6 +20,19 @@ supabase = get_supabase_client()
 API_KEYS = settings.get_openai_keys()  # Reusing same config
 current_key_index = 0
 
+# Duplicate-turn protection (see send_message)
+session_locks = KeyedLock()
+turn_calls = SingleFlight()
+completed_turns = TTLCache(ttl=settings.chat_idempotency_ttl)
+upstream_calls = SingleFlight()
+
+# Bounds concurrent Mistral calls; sheds load with 503 when the queue is too slow
+admission = AdmissionController(
+    limit=settings.ai_max_concurrency,
+    max_queue=settings.ai_max_queue,
+    slo_seconds=settings.ai_queue_slo,
+)
+
 
 def get_current_api_key() -> str:
     """Get current Mistral API key."""
@@ -58,12 +76,83 @@ How to respond:
 """
 
 
-@router.post("/message", response_model=ChatResponse)
-async def send_message(chat_message: ChatMessage, request: Request):
+async def call_mistral(payload: dict) -> str:
     """
-    Send a message to the AI chatbot and get a response.
+    Call the Mistral chat completions API, rotating through API keys.
     """
-    try:
+    last_error = None
+
+    # Try all API keys
+    for attempt in range(len(API_KEYS)):
+        try:
+            # Call Mistral API directly
+            async with httpx.AsyncClient(transport=TracingTransport()) as client:
+                response = await client.post(
+                    "https://api.mistral.ai/v1/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {get_current_api_key()}",
+                        "Content-Type": "application/json",
+                    },
+                    json=payload,
+                    timeout=30.0,
+                )
+
+                if response.status_code == 200:
+                    result = response.json()
+                    return result["choices"][0]["message"]["content"]
+                else:
+                    raise Exception(
+                        f"API error: {response.status_code} - {response.text}"
+                    )
+
+        except Exception as e:
+            last_error = str(e)
+            print(f"API key {current_key_index + 1} failed: {last_error}")
+
+            # If this was the last key, raise error
+            if attempt == len(API_KEYS) - 1:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"All API keys exhausted. Last error: {last_error}",
+                )
+
+            # Try next key
+            try_next_api_key()
+
+    raise HTTPException(status_code=500, detail="Failed to get AI response")
+
+
+async def get_ai_response(messages: List[dict]) -> str:
+    """
+    Get an AI response, sharing one upstream call between concurrent
+    requests with an identical payload.
+    """
+    payload = {
+        "model": settings.ai_model,
+        "messages": messages,
+        "temperature": settings.ai_temperature,
+        "max_tokens": settings.ai_max_tokens,
+    }
+    key = hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+    async def admitted_call() -> str:
+        async with admission.slot():
+            return await call_mistral(payload)
+
+    return await upstream_calls.do(key, admitted_call)
+
+
+async def process_turn(chat_message: ChatMessage) -> ChatResponse:
+    """
+    Run one chat turn. Turns for the same session run one at a time, so a
+    retry never races the original for history reads and writes.
+    Nothing is written until a reply exists, so a shed (503) or failed turn
+    leaves no orphan user message behind for the retry to duplicate.
+    """
+    # Shed before touching the database
+    admission.check()
+
+    async with session_locks.hold(chat_message.session_id):
         # Get or create conversation
         conversation = (
             supabase.table("conversations")
@@ -83,15 +172,6 @@ async def send_message(chat_message: ChatMessage, request: Request):
         else:
             conversation_id = conversation.data[0]["id"]
 
-        # Store user message
-        supabase.table("messages").insert(
-            {
-                "conversation_id": conversation_id,
-                "role": "user",
-                "content": chat_message.message,
-            }
-        ).execute()
-
         # Get conversation history for context
         history = (
             supabase.table("messages")
@@ -108,57 +188,22 @@ async def send_message(chat_message: ChatMessage, request: Request):
         for msg in history.data:
             messages.append({"role": msg["role"], "content": msg["content"]})
 
-        # Get AI response with key rotation
-        ai_response = None
-        last_error = None
-
-        # Try all API keys
-        for attempt in range(len(API_KEYS)):
-            try:
-                # Call Mistral API directly
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        "https://api.mistral.ai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {get_current_api_key()}",
-                            "Content-Type": "application/json",
-                        },
-                        json={
-                            "model": settings.ai_model,
-                            "messages": messages,
-                            "temperature": settings.ai_temperature,
-                            "max_tokens": settings.ai_max_tokens,
-                        },
-                        timeout=30.0,
-                    )
+        messages.append({"role": "user", "content": chat_message.message})
 
-                    if response.status_code == 200:
-                        result = response.json()
-                        ai_response = result["choices"][0]["message"]["content"]
-                        break  # Success! Exit loop
-                    else:
-                        raise Exception(
-                            f"API error: {response.status_code} - {response.text}"
-                        )
-
-            except Exception as e:
-                last_error = str(e)
-                print(f"API key {current_key_index + 1} failed: {last_error}")
-
-                # If this was the last key, raise error
-                if attempt == len(API_KEYS) - 1:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"All API keys exhausted. Last error: {last_error}",
-                    )
-
-                # Try next key
-                try_next_api_key()
+        # Get AI response with key rotation
+        ai_response = await get_ai_response(messages)
 
         if not ai_response:
             raise HTTPException(status_code=500, detail="Failed to get AI response")
 
-        # Store AI response
+        # Store the user message, then the AI response
+        supabase.table("messages").insert(
+            {
+                "conversation_id": conversation_id,
+                "role": "user",
+                "content": chat_message.message,
+            }
+        ).execute()
         supabase.table("messages").insert(
             {
                 "conversation_id": conversation_id,
@@ -169,12 +214,54 @@ async def send_message(chat_message: ChatMessage, request: Request):
 
         return ChatResponse(message=ai_response, conversation_id=str(conversation_id))
 
+
+@router.post("/message", response_model=ChatResponse)
+async def send_message(chat_message: ChatMessage, request: Request):
+    """
+    Send a message to the AI chatbot and get a response.
+    - Send an Idempotency-Key header to make retries safe: a duplicate of an
+      in-flight turn waits for it, a duplicate of a finished turn gets the
+      same response back.
+    """
+    try:
+        idempotency_key = request.headers.get("idempotency-key")
+        if not idempotency_key:
+            return await process_turn(chat_message)
+
+        # Tie the key to the message so reusing it for a new message can't
+        # replay the reply to an earlier one
+        message_hash = hashlib.sha256(chat_message.message.encode()).hexdigest()
+        turn_key = f"{chat_message.session_id}:{idempotency_key}:{message_hash}"
+        cached = completed_turns.get(turn_key)
+        if cached is not None:
+            return cached
+
+        response = await turn_calls.do(turn_key, lambda: process_turn(chat_message))
+        completed_turns.set(turn_key, response)
+        return response
+
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Chat is busy right now. Please try again shortly.",
+            headers={"Retry-After": e.retry_after_header},
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error processing message: {str(e)}"
         )
 
 
+@router.get("/admission")
+async def get_admission_stats():
+    """
+    Get upstream admission control stats (queue depth, wait times, rejections).
+    """
+    return admission.stats()
+
+
 @router.get("/history/{session_id}", response_model=List[MessageHistory])
 async def get_conversation_history(session_id: str):
     """
@@ -12,23 +12,28 @@ supabase = get_supabase_client()
 async def cleanup_old_data():
     """
     Delete old data to save database storage.
-    - Messages older than 1 hour: DELETED
+    - Messages older than 1 hour: DELETED (whole hourly partitions dropped)
     - Active sessions older than 10 minutes: DELETED (for live tracking)
     - Analytics counters: KEPT PERMANENTLY (just numbers, minimal storage)
     - Empty conversations: DELETED
+    - Section-view sketches older than 8 days: DELETED
     """
+    # Drop message partitions older than 1 hour and create upcoming ones.
+    # Kept separate so a partition failure doesn't skip the cleanup below.
+    partition_stats = {}
+    partition_error = None
     try:
-        # Delete messages older than 1 hour
-        message_cutoff = datetime.utcnow() - timedelta(hours=1)
-        message_cutoff_str = message_cutoff.isoformat()
+        partition_result = supabase.rpc(
+            "maintain_message_partitions",
+            {"retention": "1 hour", "premake_hours": 24},
+        ).execute()
 
-        message_result = (
-            supabase.table("messages")
-            .delete()
-            .lt("created_at", message_cutoff_str)
-            .execute()
-        )
+        partition_stats = partition_result.data[0] if partition_result.data else {}
+    except Exception as e:
+        partition_error = str(e)
+        print(f"❌ Message partition maintenance error: {partition_error}")
 
+    try:
         # Delete old active sessions (older than 10 minutes)
         session_cutoff = datetime.utcnow() - timedelta(minutes=10)
         session_cutoff_str = session_cutoff.isoformat()
@@ -40,6 +45,16 @@ async def cleanup_old_data():
             .execute()
         )
 
+        # Delete section-view sketches outside the 7-day popular sections window
+        sketch_cutoff = (datetime.utcnow() - timedelta(days=8)).date().isoformat()
+
+        sketch_result = (
+            supabase.table("section_view_sketches")
+            .delete()
+            .lt("day", sketch_cutoff)
+            .execute()
+        )
+
         # Delete conversations with no messages
         conversations_result = supabase.table("conversations").select("id").execute()
 
@@ -60,10 +75,13 @@ async def cleanup_old_data():
                     deleted_conversations += 1
 
         return {
-            "success": True,
-            "messages_deleted": len(message_result.data) if message_result.data else 0,
+            "success": partition_error is None,
+            "partition_error": partition_error,
+            "message_partitions_created": partition_stats.get("partitions_created", 0),
+            "message_partitions_dropped": partition_stats.get("partitions_dropped", 0),
             "sessions_cleaned": len(session_result.data) if session_result.data else 0,
             "conversations_deleted": deleted_conversations,
+            "sketches_deleted": len(sketch_result.data) if sketch_result.data else 0,
             "note": "Analytics counters kept permanently (minimal storage)",
         }
 
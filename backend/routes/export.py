@@ -0,0 +1,169 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+import csv
+import hmac
+import io
+import zlib
+
+import orjson
+
+from config import get_settings
+from database import get_supabase_client
+
+router = APIRouter()
+settings = get_settings()
+supabase = get_supabase_client()
+
+# Rows fetched per keyset page; memory use is bounded by one page
+PAGE_SIZE = 1000
+
+# Exportable datasets: table and columns, walked in (created_at, id) order
+DATASETS = {
+    "analytics": (
+        "analytics_events",
+        [
+            "id",
+            "session_id",
+            "event_type",
+            "page_path",
+            "section_name",
+            "referrer",
+            "device_type",
+            "created_at",
+        ],
+    ),
+    "messages": (
+        "messages",
+        ["id", "conversation_id", "role", "content", "created_at"],
+    ),
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Exports contain visitor data and transcripts: admin key required."""
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=403, detail="Exports are disabled (ADMIN_API_KEY not set)"
+        )
+    if not hmac.compare_digest(x_admin_key or "", settings.admin_api_key):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+
+def fetch_page(
+    table: str,
+    columns: List[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    after: Optional[Tuple[str, str]],
+) -> List[dict]:
+    """
+    Fetch the next page after the (created_at, id) keyset cursor.
+    Unlike OFFSET paging, each page costs the same however deep the export is.
+    Rows without created_at can't be placed on the cursor and are skipped.
+    """
+    query = (
+        supabase.table(table)
+        .select(",".join(columns))
+        .filter("created_at", "not.is", "null")
+    )
+
+    if start:
+        query = query.gte("created_at", start.isoformat())
+    if end:
+        query = query.lt("created_at", end.isoformat())
+    if after:
+        created_at, row_id = after
+        # Quoted: timestamps contain PostgREST's reserved "." and ":" characters
+        query = query.or_(
+            f'created_at.gt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.gt.{row_id})'
+        )
+
+    result = query.order("created_at").order("id").limit(PAGE_SIZE).execute()
+    return result.data or []
+
+
+async def iter_pages(
+    table: str,
+    columns: List[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> AsyncIterator[List[dict]]:
+    """Walk a table page by page without holding more than one page."""
+    after = None
+    while True:
+        # The Supabase client is blocking; keep it off the event loop
+        rows = await run_in_threadpool(fetch_page, table, columns, start, end, after)
+        # A short page isn't the end: PostgREST may cap rows per response
+        # below PAGE_SIZE (its "max rows" setting)
+        if not rows:
+            return
+        yield rows
+        after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+async def encode_ndjson(pages: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    async for rows in pages:
+        yield b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+
+async def encode_csv(
+    pages: AsyncIterator[List[dict]], columns: List[str]
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    async for rows in pages:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()  # Header only: empty export
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream on the fly."""
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@router.get("/{dataset}", dependencies=[Depends(require_admin)])
+async def export_dataset(
+    dataset: Literal["analytics", "messages"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    gzip: bool = False,
+):
+    """
+    Stream analytics events or chat messages as NDJSON or CSV.
+    - Keyset pagination over (created_at, id): constant memory per request
+    - Optional time range: start <= created_at < end
+    - Optional gzip compression on the fly (Content-Encoding: gzip)
+    """
+    table, columns = DATASETS[dataset]
+    pages = iter_pages(table, columns, start, end)
+
+    if format == "csv":
+        body = encode_csv(pages, columns)
+    else:
+        body = encode_ndjson(pages)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{dataset}.{format}"',
+    }
+    if gzip:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
@@ -1,38 +1,255 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
 import random
-import json
+import msgpack
+import orjson
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional, Union
+
+from config import get_settings
+from pubsub import LocalBus
 
 router = APIRouter()
+settings = get_settings()
+
+# Topics a socket can subscribe to. New sockets get DEFAULT_TOPICS.
+TOPICS = {"system", "visitors"}
+DEFAULT_TOPICS = {"system"}
+
+# Compact mode: stats snapshots kept per worker to diff against client acks
+SNAPSHOT_HISTORY = 16
+ENCODINGS = {"json", "msgpack"}
+
+
+def dumps(payload: dict) -> str:
+    """Serialize a WebSocket payload to a JSON text frame using orjson."""
+    return orjson.dumps(payload).decode()
+
+
+def encode_frame(payload: dict, encoding: str) -> Union[str, bytes]:
+    """Encode a compact frame as a JSON text frame or a msgpack binary frame."""
+    if encoding == "msgpack":
+        return msgpack.packb(payload)
+    return dumps(payload)
+
+
+@dataclass
+class CompactClient:
+    """A socket that negotiated compact frames on the system topic."""
+
+    encoding: str = "json"
+    acked_seq: Optional[int] = None
 
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        self.subscriptions: dict[WebSocket, set[str]] = {}
+        # Latest full state per topic, sent to new subscribers before deltas
+        self.snapshots: dict[str, dict] = {}
+        # Compact mode state: per-client acks, recent stats, logs for this tick
+        self.compact_clients: dict[WebSocket, CompactClient] = {}
+        self.stats_history: OrderedDict[int, dict] = OrderedDict()
+        self.stats_seq = 0
+        self.pending_logs: list[dict] = []
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, topics: Optional[set[str]] = None):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.subscriptions[websocket] = set(DEFAULT_TOPICS if topics is None else topics)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+        self.subscriptions.pop(websocket, None)
+        self.compact_clients.pop(websocket, None)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception:
-                # Handle broken connections gracefully
-                pass
+    def set_mode(self, websocket: WebSocket, mode: str, encoding: str = "json"):
+        if mode == "compact":
+            self.compact_clients[websocket] = CompactClient(encoding=encoding)
+        else:
+            self.compact_clients.pop(websocket, None)
+
+    def ack(self, websocket: WebSocket, seq: int):
+        client = self.compact_clients.get(websocket)
+        if client is not None and (client.acked_seq or 0) < seq <= self.stats_seq:
+            client.acked_seq = seq
+
+    async def subscribe(self, websocket: WebSocket, topic: str):
+        self.subscriptions[websocket].add(topic)
+        snapshot = self.snapshots.get(topic)
+        if snapshot:
+            await websocket.send_text(dumps(snapshot))
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        self.subscriptions[websocket].discard(topic)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return any(topic in topics for topics in self.subscriptions.values())
+
+    async def broadcast(self, message: str, topic: str = "system"):
+        """Send an already-serialized message to every subscriber concurrently."""
+        connections = [
+            connection
+            for connection in self.active_connections
+            if topic in self.subscriptions.get(connection, ())
+            # Compact clients get system frames from broadcast_compact instead
+            and not (topic == "system" and connection in self.compact_clients)
+        ]
+        await self._send_all([(connection, message) for connection in connections])
+
+    async def _send_all(self, messages: list[tuple[WebSocket, Union[str, bytes]]]):
+        results = await asyncio.gather(
+            *(
+                connection.send_bytes(message)
+                if isinstance(message, bytes)
+                else connection.send_text(message)
+                for connection, message in messages
+            ),
+            return_exceptions=True,
+        )
+        # Drop broken connections instead of retrying them every tick
+        for (connection, _), result in zip(messages, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
+
+    async def broadcast_compact(self, payload: dict):
+        """
+        Send a system frame to compact clients. Logs are held and batched
+        into the next stats frame. Stats are delta-encoded against each
+        client's last acknowledged snapshot (or sent whole as a keyframe),
+        and each distinct (base, encoding) frame is encoded only once.
+        """
+        if payload.get("type") == "log":
+            self.pending_logs.append(
+                {key: value for key, value in payload.items() if key != "type"}
+            )
+            return
+        if payload.get("type") != "stats":
+            return
+
+        snapshot = {key: value for key, value in payload.items() if key != "type"}
+        self.stats_seq += 1
+        self.stats_history[self.stats_seq] = snapshot
+        while len(self.stats_history) > SNAPSHOT_HISTORY:
+            self.stats_history.popitem(last=False)
+
+        logs, self.pending_logs = self.pending_logs, []
+        frames: dict[tuple[Optional[int], str], Union[str, bytes]] = {}
+        messages = []
+        for connection, client in self.compact_clients.items():
+            if "system" not in self.subscriptions.get(connection, ()):
+                continue
+
+            base_seq = client.acked_seq if client.acked_seq in self.stats_history else None
+            key = (base_seq, client.encoding)
+            if key not in frames:
+                frames[key] = encode_frame(
+                    self._compact_frame(snapshot, base_seq, logs), client.encoding
+                )
+            messages.append((connection, frames[key]))
+
+        await self._send_all(messages)
+
+    def _compact_frame(
+        self, snapshot: dict, base_seq: Optional[int], logs: list[dict]
+    ) -> dict:
+        frame = {"t": "s", "q": self.stats_seq}
+        if base_seq is None:
+            frame["d"] = snapshot  # Keyframe
+        else:
+            base = self.stats_history[base_seq]
+            frame["b"] = base_seq
+            frame["d"] = {
+                key: value for key, value in snapshot.items() if base.get(key) != value
+            }
+        if logs:
+            frame["l"] = logs
+        return frame
+
+    async def deliver(self, topic: str, kind: str, frame: str):
+        """Fan a frame from the bus out to this worker's subscribers."""
+        if kind == "delta":
+            # Keep a merged snapshot so new subscribers start from full state.
+            # Workers joining the bus late get it replayed by the producer.
+            self.snapshots.setdefault(topic, {}).update(orjson.loads(frame))
+        # "idle" frames are stats skipped by the compact tick back-off
+        if topic == "system" and self.compact_clients and kind != "idle":
+            await self.broadcast_compact(orjson.loads(frame))
+        if self.has_subscribers(topic):
+            await self.broadcast(frame, topic)
+
+    def replay(self) -> list[tuple[str, str, str]]:
+        """Current topic snapshots, as delta frames for a worker joining the bus."""
+        return [
+            (topic, "delta", dumps(snapshot))
+            for topic, snapshot in self.snapshots.items()
+        ]
+
+    def presence(self) -> dict:
+        """Connection count and subscribed topics reported to the bus."""
+        return {
+            "connections": len(self.active_connections),
+            "topics": sorted(set().union(*self.subscriptions.values())),
+        }
 
 
 manager = ConnectionManager()
 
+# Shared across uvicorn workers: one elected producer runs the generators,
+# every worker fans the frames out to its own sockets.
+bus = LocalBus(
+    settings.monitor_bus_path, manager.deliver, manager.presence, manager.replay
+)
+
+
+async def publish(payload: dict, topic: str = "system", kind: str = "frame"):
+    """Serialize once and publish the same frame to every worker."""
+    await bus.publish(topic, kind, dumps(payload))
+
+
+async def publish_delta(topic: str, delta: dict):
+    """Publish only the changed fields; workers merge them into the snapshot."""
+    await bus.publish(topic, "delta", dumps({"type": topic, **delta}))
+
+
+def within_tolerance(values: dict, baseline: Optional[dict], tolerance: float) -> bool:
+    """
+    True if no value moved more than `tolerance` (relative) from the baseline.
+    Non-numeric values must match exactly.
+    """
+    if baseline is None or values.keys() != baseline.keys():
+        return False
+    for key, value in values.items():
+        base = baseline[key]
+        if isinstance(value, (int, float)) and isinstance(base, (int, float)):
+            if abs(value - base) > tolerance * max(abs(base), 1):
+                return False
+        elif value != base:
+            return False
+    return True
+
 
 async def system_stats_generator():
-    """Generates simulated system statistics."""
+    """
+    Generates simulated system statistics every MONITOR_TICK_SECONDS.
+    Full-mode clients get every tick. For compact clients the interval
+    between frames doubles (up to MONITOR_MAX_TICK_SECONDS) while values stay
+    within MONITOR_CHANGE_TOLERANCE of the last change.
+    """
+    tick = settings.monitor_tick_seconds
+    compact_interval = tick
+    elapsed = 0.0
+    next_compact = 0.0
+    baseline = None
     while True:
+        if not bus.is_producer:
+            # Another worker is producing; its frames arrive over the bus
+            await asyncio.sleep(settings.monitor_tick_seconds)
+            continue
+
         # Simulate stats (replace with psutil in real prod if needed, but risky on some hosting)
         stats = {
             "type": "stats",
@@ -40,12 +257,13 @@ async def system_stats_generator():
             "cpu": round(random.uniform(10, 40), 1),
             "memory": round(random.uniform(30, 60), 1),
             "requests_per_sec": random.randint(5, 50),
-            "active_connections": len(manager.active_connections),
+            "active_connections": bus.total_connections(),
             "status": "healthy",
         }
 
         # Occasionally send a "log"
-        if random.random() < 0.3:
+        has_log = random.random() < 0.3
+        if has_log:
             methods = ["GET", "POST", "PUT", "DELETE"]
             paths = ["/api/chat", "/api/projects", "/api/contact", "/api/auth"]
             status_codes = [200, 201, 200, 200, 200, 400, 500]
@@ -58,27 +276,143 @@ async def system_stats_generator():
                 "status": random.choice(status_codes),
                 "latency": f"{random.randint(10, 500)}ms",
             }
-            await manager.broadcast(json.dumps(log))
+            await publish(log)
+
+        # Adaptive compact tick: back off while stats only jitter, reset on a
+        # real change. Compared against the last change so slow drift counts.
+        values = {key: value for key, value in stats.items() if key != "timestamp"}
+        unchanged = not has_log and within_tolerance(
+            values, baseline, settings.monitor_change_tolerance
+        )
+        if not unchanged:
+            compact_interval = tick
+            baseline = values
+
+        if unchanged and elapsed < next_compact:
+            await publish(stats, kind="idle")
+        else:
+            await publish(stats)
+            next_compact = elapsed + compact_interval
+            if unchanged:
+                compact_interval = min(
+                    compact_interval * 2, settings.monitor_max_tick_seconds
+                )
 
-        await manager.broadcast(json.dumps(stats))
-        await asyncio.sleep(2)  # Update every 2 seconds
+        await asyncio.sleep(tick)
+        elapsed += tick
+
+
+async def visitor_stats_generator():
+    """
+    Computes live visitor counts once per tick and pushes them to the
+    `visitors` topic, only when a value changed.
+    """
+    from routes.analytics import fetch_live_counts
+
+    last_counts: dict = {}
+    while True:
+        if bus.is_producer and bus.has_subscribers("visitors"):
+            try:
+                counts = await asyncio.to_thread(fetch_live_counts)
+            except Exception as e:
+                print(f"❌ Visitor stats error: {e}")
+            else:
+                delta = {
+                    key: value
+                    for key, value in counts.items()
+                    if last_counts.get(key) != value
+                }
+                if delta:
+                    last_counts.update(delta)
+                    await publish_delta("visitors", delta)
+
+        await asyncio.sleep(settings.visitor_push_interval)
 
 
 # Startup event moved to main.py lifespan
 
 
+def parse_mode(args: list[str]) -> tuple[str, str]:
+    """Parse `compact [json|msgpack]` or `full` into (mode, encoding)."""
+    mode = args[0] if args and args[0] in ("compact", "full") else "full"
+    encoding = args[1] if len(args) > 1 and args[1] in ENCODINGS else "json"
+    return mode, encoding
+
+
+async def send_mode(websocket: WebSocket, mode: str, encoding: str):
+    await websocket.send_text(
+        dumps({"type": "mode", "mode": mode, "encoding": encoding})
+    )
+
+
+def parse_topics(raw: Optional[str]) -> Optional[set[str]]:
+    """Parse a comma-separated ?topics= query parameter."""
+    if raw is None:
+        return None
+    return {topic.strip() for topic in raw.split(",") if topic.strip() in TOPICS}
+
+
 @router.websocket("/ws/system")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    topics = parse_topics(websocket.query_params.get("topics"))
+    await manager.connect(websocket, topics)
     try:
+        if websocket.query_params.get("mode") == "compact":
+            encoding = websocket.query_params.get("encoding", "json")
+            mode, encoding = parse_mode(["compact", encoding])
+            manager.set_mode(websocket, mode, encoding)
+            await send_mode(websocket, mode, encoding)
+
+        for topic in manager.subscriptions[websocket]:
+            snapshot = manager.snapshots.get(topic)
+            if snapshot:
+                await websocket.send_text(dumps(snapshot))
+
         while True:
             # Keep connection alive and listen for "commands" from frontend
             data = await websocket.receive_text()
             if data == "ping":
-                await websocket.send_text(json.dumps({"type": "pong"}))
+                await websocket.send_text(dumps({"type": "pong"}))
+            elif data.startswith("ack "):
+                # Compact clients acknowledge stats frames to advance the delta base
+                try:
+                    manager.ack(websocket, int(data[4:]))
+                except ValueError:
+                    pass
+            elif data.startswith("mode "):
+                mode, encoding = parse_mode(data.split()[1:])
+                manager.set_mode(websocket, mode, encoding)
+                await send_mode(websocket, mode, encoding)
+            elif data.startswith("subscribe ") or data.startswith("unsubscribe "):
+                command, _, topic = data.partition(" ")
+                topic = topic.strip()
+                if topic not in TOPICS:
+                    await websocket.send_text(
+                        dumps(
+                            {
+                                "type": "terminal_response",
+                                "content": f"Unknown topic: {topic}",
+                            }
+                        )
+                    )
+                    continue
+
+                if command == "subscribe":
+                    await manager.subscribe(websocket, topic)
+                else:
+                    manager.unsubscribe(websocket, topic)
+
+                await websocket.send_text(
+                    dumps(
+                        {
+                            "type": "subscriptions",
+                            "topics": sorted(manager.subscriptions[websocket]),
+                        }
+                    )
+                )
             elif data == "status":
                 await websocket.send_text(
-                    json.dumps(
+                    dumps(
                         {
                             "type": "terminal_response",
                             "content": "All systems operational. AI Core: ONLINE. Database: CONNECTED.",
@@ -87,13 +421,13 @@ async def websocket_endpoint(websocket: WebSocket):
                 )
             elif data.startswith("echo"):
                 await websocket.send_text(
-                    json.dumps(
+                    dumps(
                         {"type": "terminal_response", "content": f"Echo: {data[5:]}"}
                     )
                 )
             else:
                 await websocket.send_text(
-                    json.dumps(
+                    dumps(
                         {
                             "type": "terminal_response",
                             "content": f"Unknown command: {data}",
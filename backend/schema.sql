@@ -9,16 +9,22 @@ CREATE TABLE IF NOT EXISTS conversations (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- Messages table for chat history
+-- Messages table for chat history, partitioned by hour of created_at so
+-- retention drops whole partitions instead of deleting rows
+-- (see maintain_message_partitions below)
 CREATE TABLE IF NOT EXISTS messages (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4 (),
+    id UUID NOT NULL DEFAULT uuid_generate_v4 (),
     conversation_id UUID REFERENCES conversations (id) ON DELETE CASCADE,
     role TEXT NOT NULL CHECK (
         role IN ('user', 'assistant', 'system')
     ),
     content TEXT NOT NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Safety net for rows outside the pre-created hourly partitions
+CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT;
 
 -- Analytics events table
 CREATE TABLE IF NOT EXISTS analytics_events (
@@ -66,6 +72,98 @@ CREATE INDEX IF NOT EXISTS idx_contact_status ON contact_messages (status);
 
 CREATE INDEX IF NOT EXISTS idx_contact_created_at ON contact_messages (created_at DESC);
 
+-- Create upcoming hourly message partitions and drop expired ones.
+-- Dropping a partition is a metadata operation: no row-by-row DELETE, no
+-- table bloat, no vacuum work. Called by the cleanup job.
+-- SECURITY DEFINER: creating and dropping partitions requires owning
+-- messages, which the cleanup job's service_role doesn't. Execution is
+-- restricted to service_role below.
+CREATE OR REPLACE FUNCTION maintain_message_partitions(
+    retention INTERVAL DEFAULT INTERVAL '1 hour',
+    premake_hours INTEGER DEFAULT 24
+)
+RETURNS TABLE (partitions_created INTEGER, partitions_dropped INTEGER) AS $$
+DECLARE
+    current_hour TIMESTAMPTZ := date_trunc('hour', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    range_start TIMESTAMPTZ;
+    partition_name TEXT;
+    existing RECORD;
+BEGIN
+    partitions_created := 0;
+    partitions_dropped := 0;
+
+    -- The default partition should stay (nearly) empty; trim it row-wise
+    -- first so expired rows never have to be moved below
+    DELETE FROM messages_default WHERE created_at < NOW() - retention;
+
+    -- Partitions are named messages_pYYYYMMDDHH24 (UTC start of the hour)
+    FOR i IN 0..premake_hours LOOP
+        range_start := current_hour + make_interval(hours => i);
+        partition_name := 'messages_p' || to_char(range_start AT TIME ZONE 'UTC', 'YYYYMMDDHH24');
+
+        IF to_regclass(partition_name) IS NULL THEN
+            -- CREATE ... PARTITION OF fails while messages_default holds rows
+            -- for the new range, so move them out and back in around it
+            CREATE TEMP TABLE IF NOT EXISTS pg_temp.messages_moving (LIKE messages) ON COMMIT DROP;
+
+            WITH moved AS (
+                DELETE FROM messages_default
+                WHERE created_at >= range_start
+                    AND created_at < range_start + INTERVAL '1 hour'
+                RETURNING *
+            )
+            INSERT INTO pg_temp.messages_moving SELECT * FROM moved;
+
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF messages FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                range_start,
+                range_start + INTERVAL '1 hour'
+            );
+            partitions_created := partitions_created + 1;
+
+            INSERT INTO messages SELECT * FROM pg_temp.messages_moving;
+            TRUNCATE pg_temp.messages_moving;
+        END IF;
+    END LOOP;
+
+    -- Drop partitions whose whole hour is older than the retention window.
+    -- Partitions don't inherit RLS from messages, and PostgREST exposes them
+    -- as tables of their own, so enable it on any that lack it.
+    FOR existing IN
+        SELECT child.relname, child.relrowsecurity
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'messages'::regclass
+    LOOP
+        IF existing.relname ~ '^messages_p[0-9]{10}$' THEN
+            range_start := to_timestamp(substring(existing.relname FROM 11), 'YYYYMMDDHH24')::TIMESTAMP AT TIME ZONE 'UTC';
+
+            IF range_start + INTERVAL '1 hour' <= NOW() - retention THEN
+                EXECUTE format('DROP TABLE %I', existing.relname);
+                partitions_dropped := partitions_dropped + 1;
+                CONTINUE;
+            END IF;
+        END IF;
+
+        IF NOT existing.relrowsecurity THEN
+            EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', existing.relname);
+        END IF;
+    END LOOP;
+
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- Otherwise anyone with the anon key could drop partitions via RPC
+REVOKE EXECUTE ON FUNCTION maintain_message_partitions(INTERVAL, INTEGER)
+FROM PUBLIC, anon, authenticated;
+
+GRANT EXECUTE ON FUNCTION maintain_message_partitions(INTERVAL, INTEGER) TO service_role;
+
+-- Create the initial hourly partitions
+SELECT maintain_message_partitions();
+
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -91,6 +189,9 @@ ALTER TABLE conversations ENABLE ROW LEVEL SECURITY;
 
 ALTER TABLE messages ENABLE ROW LEVEL SECURITY;
 
+-- Partitions are reachable directly too; RLS with no policies denies that
+ALTER TABLE messages_default ENABLE ROW LEVEL SECURITY;
+
 ALTER TABLE analytics_events ENABLE ROW LEVEL SECURITY;
 
 ALTER TABLE contact_messages ENABLE ROW LEVEL SECURITY;
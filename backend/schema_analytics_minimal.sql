@@ -9,14 +9,29 @@ CREATE TABLE IF NOT EXISTS analytics_counters (
 -- Insert initial counters
 INSERT INTO
     analytics_counters (counter_name, counter_value)
-VALUES ('total_page_views', 0)
+VALUES ('total_page_views', 0),
+    ('filtered_bot_events', 0)
 ON CONFLICT (counter_name) DO NOTHING;
 
 -- Active sessions table (for live visitor tracking - auto-cleanup)
+-- Not time-partitioned: rows are upserted by session_id, and a unique key on a
+-- partitioned table must include the partition key (last_seen). One row per
+-- live session keeps the table small, so the 10-minute DELETE stays cheap.
 CREATE TABLE IF NOT EXISTS active_sessions (
     session_id VARCHAR(100) PRIMARY KEY,
     last_seen TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- Index for faster cleanup
-CREATE INDEX IF NOT EXISTS idx_active_sessions_last_seen ON active_sessions (last_seen);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_active_sessions_last_seen ON active_sessions (last_seen);
+
+-- Popular sections: one compact Space-Saving summary per worker per day
+-- (top-K sketch). Each worker only rewrites its own rows, so concurrent
+-- flushes never overwrite each other; readers merge the rows of a day.
+CREATE TABLE IF NOT EXISTS section_view_sketches (
+    day DATE NOT NULL,
+    worker_id TEXT NOT NULL,
+    summary JSONB NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (day, worker_id)
+);
@@ -0,0 +1,58 @@
+-- Migrate an existing unpartitioned messages table to hourly partitions.
+-- Fresh installs get the partitioned table from schema.sql directly.
+-- Run schema.sql's maintain_message_partitions function definition (and its
+-- REVOKE/GRANT statements) first.
+-- Messages are only kept for 1 hour, so only the recent rows are copied.
+
+BEGIN;
+
+ALTER TABLE messages RENAME TO messages_unpartitioned;
+
+DROP INDEX IF EXISTS idx_messages_conversation_id;
+
+DROP INDEX IF EXISTS idx_messages_created_at;
+
+CREATE TABLE messages (
+    id UUID NOT NULL DEFAULT uuid_generate_v4 (),
+    conversation_id UUID REFERENCES conversations (id) ON DELETE CASCADE,
+    role TEXT NOT NULL CHECK (
+        role IN ('user', 'assistant', 'system')
+    ),
+    content TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE messages_default PARTITION OF messages DEFAULT;
+
+-- Create the current and upcoming hourly partitions (with RLS enabled).
+-- Copied rows from the previous hour land in messages_default, which the
+-- same function trims.
+SELECT maintain_message_partitions(INTERVAL '1 hour', 24);
+
+INSERT INTO
+    messages (id, conversation_id, role, content, created_at)
+SELECT id, conversation_id, role, content, COALESCE(created_at, NOW())
+FROM messages_unpartitioned
+WHERE
+    created_at >= NOW() - INTERVAL '1 hour';
+
+DROP TABLE messages_unpartitioned;
+
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_id ON messages (conversation_id);
+
+CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages (created_at DESC);
+
+ALTER TABLE messages ENABLE ROW LEVEL SECURITY;
+
+-- Partitions are reachable directly too; RLS with no policies denies that
+ALTER TABLE messages_default ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to messages" ON messages FOR
+SELECT USING (true);
+
+CREATE POLICY "Allow service role to insert messages" ON messages FOR INSERT
+WITH
+    CHECK (true);
+
+COMMIT;
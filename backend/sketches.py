@@ -0,0 +1,133 @@
+import heapq
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters summary with at most `capacity` counters.
+
+    Counts are overestimates by at most the tracked error, and every item with
+    a true frequency above total / capacity is guaranteed to be kept.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, item: str, count: int = 1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the smallest counter; the newcomer inherits its count
+            victim = min(self.counts, key=self.counts.__getitem__)
+            floor = self.counts.pop(victim)
+            self.errors.pop(victim)
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Combine two summaries into a new one (used to merge days/workers)."""
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        counts = dict(self.counts)
+        errors = dict(self.errors)
+        for item, count in other.counts.items():
+            counts[item] = counts.get(item, 0) + count
+            errors[item] = errors.get(item, 0) + other.errors[item]
+
+        for item, count in heapq.nlargest(
+            merged.capacity, counts.items(), key=lambda entry: entry[1]
+        ):
+            merged.counts[item] = count
+            merged.errors[item] = errors[item]
+        return merged
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        return heapq.nlargest(k, self.counts.items(), key=lambda entry: entry[1])
+
+    def to_dict(self) -> dict:
+        # Copies, so a snapshot can be serialized while counting continues
+        return {
+            "capacity": self.capacity,
+            "counts": dict(self.counts),
+            "errors": dict(self.errors),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SpaceSaving":
+        summary = cls(data["capacity"])
+        summary.counts = {item: int(count) for item, count in data["counts"].items()}
+        summary.errors = {
+            item: int(data.get("errors", {}).get(item, 0)) for item in summary.counts
+        }
+        return summary
+
+
+def utc_today() -> date:
+    return datetime.utcnow().date()
+
+
+class DailyTopK:
+    """
+    Per-day Space-Saving summaries over a sliding window of days.
+
+    `local` holds this worker's own counts, and `days` the merged view of
+    those plus the persisted counts of every other worker. Each worker
+    only ever persists its own summaries, so concurrent flushes can't
+    overwrite each other. The top-k over the window is cached until the
+    next update.
+    """
+
+    def __init__(self, window_days: int, capacity: int):
+        self.window_days = window_days
+        self.capacity = capacity
+        self.days: Dict[str, SpaceSaving] = {}
+        self.local: Dict[str, SpaceSaving] = {}
+        self.dirty: Set[str] = set()  # Days with local counts not yet persisted
+        self._window: Optional[Tuple[str, SpaceSaving]] = None
+
+    def window_start(self, today: Optional[date] = None) -> date:
+        today = today or utc_today()
+        return today - timedelta(days=self.window_days - 1)
+
+    def record(self, item: str, day: Optional[date] = None, count: int = 1):
+        key = (day or utc_today()).isoformat()
+        for summaries in (self.days, self.local):
+            summaries.setdefault(key, SpaceSaving(self.capacity)).add(item, count)
+        self.dirty.add(key)
+        self._window = None
+
+    def load(self, day: str, others: SpaceSaving):
+        """Replace a day's view with other workers' counts plus local ones."""
+        local = self.local.get(day)
+        self.days[day] = others.merge(local) if local else others
+        self._window = None
+
+    def take_dirty(self) -> Dict[str, dict]:
+        """Snapshot the local summaries changed since the last flush."""
+        dirty, self.dirty = self.dirty, set()
+        return {day: self.local[day].to_dict() for day in dirty if day in self.local}
+
+    def mark_dirty(self, days: Iterable[str]):
+        """Flag days for the next flush again (after a failed one)."""
+        self.dirty.update(days)
+
+    def top(self, k: int, today: Optional[date] = None) -> List[Tuple[str, int]]:
+        start = self.window_start(today).isoformat()
+        if self._window is None or self._window[0] != start:
+            self._prune(start)
+            merged = SpaceSaving(self.capacity)
+            for summary in self.days.values():
+                merged = merged.merge(summary)
+            self._window = (start, merged)
+        return self._window[1].top(k)
+
+    def _prune(self, start: str):
+        for summaries in (self.days, self.local):
+            for day in [day for day in summaries if day < start]:
+                del summaries[day]
+        self.dirty = {day for day in self.dirty if day >= start}
@@ -0,0 +1,84 @@
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Crawlers, monitors, link unfurlers, headless browsers and HTTP libraries.
+# Lowercase substrings: plain `in` checks are much faster than an equivalent
+# case-insensitive regex alternation on long User-Agent strings.
+# "bot" only counts as a name suffix followed by a delimiter (Googlebot/2.1,
+# YandexBot;, Slackbot-LinkExpanding), or at the very end of the string.
+# A bare substring would also match device names such as "CUBOT".
+BOT_TOKENS = (
+    "bot/",
+    "bot;",
+    "bot)",
+    "bot-",
+    "bot,",
+    "bot ",
+    "crawl",
+    "spider",
+    "slurp",
+    "scrap",
+    "fetch",
+    "preview",
+    "monitor",
+    "uptime",
+    "lighthouse",
+    "headless",
+    "phantomjs",
+    "selenium",
+    "puppeteer",
+    "playwright",
+    "python-requests",
+    "python-httpx",
+    "aiohttp",
+    "curl",
+    "wget",
+    "httpie",
+    "go-http-client",
+    "java/",
+    "okhttp",
+    "axios",
+    "facebookexternalhit",
+    "embedly",
+    "whatsapp",
+)
+# Device names that end in "bot" and would match the tokens above
+BOT_LOOKALIKES = ("cubot",)
+TABLET_TOKENS = ("ipad", "tablet", "kindle", "silk", "playbook")
+MOBILE_TOKENS = ("mobi", "iphone", "ipod", "windows phone", "blackberry", "opera mini")
+
+
+class UserAgentInfo(NamedTuple):
+    """Result of classifying a User-Agent string."""
+
+    is_bot: bool
+    device_type: str  # "bot", "mobile", "tablet" or "desktop"
+
+
+@lru_cache(maxsize=4096)
+def classify_user_agent(user_agent: Optional[str]) -> UserAgentInfo:
+    """
+    Classify a User-Agent as bot or human and derive its device type.
+    Cached: real traffic repeats a small set of User-Agent strings.
+    """
+    # Browsers always send a User-Agent; an empty one is a script
+    if not user_agent:
+        return UserAgentInfo(is_bot=True, device_type="bot")
+
+    agent = user_agent.lower()
+    bot_agent = agent
+    for lookalike in BOT_LOOKALIKES:
+        bot_agent = bot_agent.replace(lookalike, "")
+    if bot_agent.endswith("bot") or any(token in bot_agent for token in BOT_TOKENS):
+        return UserAgentInfo(is_bot=True, device_type="bot")
+
+    # Android tablets omit "Mobile" from their User-Agent
+    if any(token in agent for token in TABLET_TOKENS) or (
+        "android" in agent and "mobile" not in agent
+    ):
+        return UserAgentInfo(is_bot=False, device_type="tablet")
+
+    if any(token in agent for token in MOBILE_TOKENS):
+        return UserAgentInfo(is_bot=False, device_type="mobile")
+
+    return UserAgentInfo(is_bot=False, device_type="desktop")
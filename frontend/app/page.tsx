@@ -8,12 +8,12 @@ import { useAnalytics } from "@/hooks/useAnalytics";
 
 export default function Home() {
   // Track analytics
-  useAnalytics();
+  const { trackSectionView } = useAnalytics();
 
   return (
     <main className="bg-[#0a0a0a] min-h-screen text-white">
       <IdentityScroll />
-      <ContentSections />
+      <ContentSections onSectionView={trackSectionView} />
       <LiveAnalytics />
       <ChatWidget />
     </main>
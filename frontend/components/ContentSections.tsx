@@ -4,17 +4,43 @@ import { BentoGrid, BentoGridItem } from "./ui/bento-grid";
 import { ProjectModal } from "./ProjectModal";
 import ContactModal from "./ContactModal";
 // import AnalyticsDashboard from "./AnalyticsDashboard";
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 
-export function ContentSections() {
+interface ContentSectionsProps {
+  onSectionView?: (sectionName: string) => void;
+}
+
+export function ContentSections({ onSectionView }: ContentSectionsProps) {
   const [modalProject, setModalProject] = useState<{ title: string; link: string } | null>(null);
   const [isContactOpen, setIsContactOpen] = useState(false);
+  const containerRef = useRef<HTMLDivElement>(null);
+
+  // Report each section once per visit, when it reaches the middle of the
+  // screen (a visibility ratio would never fire for sections taller than it)
+  useEffect(() => {
+    const container = containerRef.current;
+    if (!onSectionView || !container || typeof IntersectionObserver === 'undefined') return;
+
+    const seen = new Set<string>();
+    const observer = new IntersectionObserver((entries) => {
+      for (const entry of entries) {
+        const name = (entry.target as HTMLElement).dataset.section;
+        if (!entry.isIntersecting || !name || seen.has(name)) continue;
+        seen.add(name);
+        onSectionView(name);
+        observer.unobserve(entry.target);
+      }
+    }, { rootMargin: '-50% 0px -50% 0px' });
+
+    container.querySelectorAll('[data-section]').forEach(section => observer.observe(section));
+    return () => observer.disconnect();
+  }, [onSectionView]);
 
   return (
-    <div className="relative z-0 -mt-[100vh] bg-[#0a0a0a] text-white">
+    <div ref={containerRef} className="relative z-0 -mt-[100vh] bg-[#0a0a0a] text-white">
       
       {/* About Me Section */}
-      <section className="py-24 px-8 md:px-24 border-t border-white/10">
+      <section data-section="about" className="py-24 px-8 md:px-24 border-t border-white/10">
         <h3 className="text-sm font-light tracking-[0.2em] uppercase text-gray-400 mb-12">Who Am I</h3>
         <div className="grid grid-cols-1 md:grid-cols-2 gap-12 items-center">
             <div className="text-2xl md:text-3xl font-light leading-relaxed text-gray-200">
@@ -30,7 +56,7 @@ export function ContentSections() {
       </section>
 
       {/* Experience Section with Timeline */}
-      <section className="py-24 px-8 md:px-24 border-t border-white/10">
+      <section data-section="experience" className="py-24 px-8 md:px-24 border-t border-white/10">
         <h3 className="text-sm font-light tracking-[0.2em] uppercase text-gray-400 mb-12">Experience</h3>
         
         <div className="max-w-5xl mx-auto">
@@ -82,7 +108,7 @@ export function ContentSections() {
       </section>
 
       {/* Skills Section - Technical Grid System */}
-      <section className="py-20 md:py-24 lg:py-24 px-4 md:px-12 lg:px-24 border-t border-white/10">
+      <section data-section="skills" className="py-20 md:py-24 lg:py-24 px-4 md:px-12 lg:px-24 border-t border-white/10">
         <h3 className="text-xs md:text-sm font-light tracking-[0.2em] uppercase text-gray-400 mb-12">System Mastery</h3>
         
         {/* Main Grid Container - Architectural Look */}
@@ -174,7 +200,7 @@ export function ContentSections() {
       </section>
 
       {/* Client Projects Section - Premium Dossier Style */}
-      <section className="py-20 md:py-28 lg:py-32 px-4 md:px-12 lg:px-24 border-t border-white/10 relative overflow-hidden">
+      <section data-section="client_projects" className="py-20 md:py-28 lg:py-32 px-4 md:px-12 lg:px-24 border-t border-white/10 relative overflow-hidden">
          {/* Background Elements */}
          <div className="absolute top-0 right-0 w-[300px] md:w-[400px] lg:w-[500px] h-[300px] md:h-[400px] lg:h-[500px] bg-blue-500/5 blur-[80px] md:blur-[100px] pointer-events-none"></div>
          
@@ -238,7 +264,7 @@ export function ContentSections() {
       </section>
 
       {/* Personal Projects Section with Premium Bento Grid */}
-      <section className="py-20 md:py-24 lg:py-24 px-4 md:px-12 lg:px-24 border-t border-white/10 relative">
+      <section data-section="personal_projects" className="py-20 md:py-24 lg:py-24 px-4 md:px-12 lg:px-24 border-t border-white/10 relative">
          <div className="flex flex-col md:flex-row md:items-end justify-between mb-12 md:mb-16 max-w-7xl mx-auto">
              <div>
                 <h3 className="text-xs md:text-sm font-light tracking-[0.2em] uppercase text-gray-400 mb-2 md:mb-4">Innovation Lab</h3>
@@ -306,7 +332,7 @@ export function ContentSections() {
       </section>
 
       {/* Contact Section - Premium Finale */}
-      <section className="py-24 md:py-32 lg:py-40 px-4 md:px-12 lg:px-8 relative overflow-hidden flex flex-col items-center justify-center border-t border-white/10">
+      <section data-section="contact" className="py-24 md:py-32 lg:py-40 px-4 md:px-12 lg:px-8 relative overflow-hidden flex flex-col items-center justify-center border-t border-white/10">
           {/* Background Glow */}
           <div className="absolute top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2 w-[300px] md:w-[450px] lg:w-[600px] h-[300px] md:h-[450px] lg:h-[600px] bg-white/5 blur-[80px] md:blur-[100px] lg:blur-[120px] pointer-events-none"></div>
           
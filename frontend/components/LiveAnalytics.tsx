@@ -12,12 +12,17 @@ export default function LiveAnalytics() {
   const [stats, setStats] = useState<LiveStats>({ activeVisitors: 0, totalViews: 0 });
 
   useEffect(() => {
+    const apiUrl = process.env.NEXT_PUBLIC_API_URL;
+    let socket: WebSocket | null = null;
+    let pollInterval: ReturnType<typeof setInterval> | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
     const fetchStats = async () => {
       try {
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/analytics/visitors/live`);
+        const response = await fetch(`${apiUrl}/api/analytics/visitors/live`);
         if (response.ok) {
           const data = await response.json();
-          console.log('Live stats:', data); // Debug log
           setStats({
             activeVisitors: data.active_visitors || 0,
             totalViews: data.total_views || 0
@@ -28,10 +33,59 @@ export default function LiveAnalytics() {
       }
     };
 
-    fetchStats();
-    const interval = setInterval(fetchStats, 10000); // Update every 10 seconds
+    // Fallback: poll the REST endpoint while the socket is unavailable
+    const startPolling = () => {
+      if (pollInterval) return;
+      fetchStats();
+      pollInterval = setInterval(fetchStats, 10000); // Update every 10 seconds
+    };
+
+    const stopPolling = () => {
+      if (pollInterval) clearInterval(pollInterval);
+      pollInterval = null;
+    };
+
+    // Preferred: the server pushes count changes on the `visitors` topic
+    const connect = () => {
+      if (!apiUrl) {
+        startPolling();
+        return;
+      }
+
+      socket = new WebSocket(`${apiUrl.replace(/^http/, 'ws')}/ws/system?topics=visitors`);
+
+      socket.onopen = () => {
+        stopPolling();
+        // Start from full counts: the socket only pushes fields that change
+        fetchStats();
+      };
+
+      socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type !== 'visitors') return;
+
+        // Messages are deltas: only changed fields are present
+        setStats(prev => ({
+          activeVisitors: data.active_visitors ?? prev.activeVisitors,
+          totalViews: data.total_views ?? prev.totalViews
+        }));
+      };
+
+      socket.onclose = () => {
+        if (closed) return;
+        startPolling();
+        reconnectTimer = setTimeout(connect, 30000);
+      };
+    };
+
+    connect();
 
-    return () => clearInterval(interval);
+    return () => {
+      closed = true;
+      stopPolling();
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      socket?.close();
+    };
   }, []);
 
   return (
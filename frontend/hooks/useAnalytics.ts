@@ -1,5 +1,5 @@
 import { useEffect, useCallback } from 'react';
-import { analyticsAPI } from '@/lib/api';
+import { analyticsAPI, AnalyticsEvent } from '@/lib/api';
 
 // Generate or retrieve session ID
 const getSessionId = (): string => {
@@ -15,14 +15,42 @@ const getSessionId = (): string => {
   return sessionId;
 };
 
+// Events are queued and sent together to /track/batch
+const FLUSH_DELAY_MS = 5000;
+const MAX_QUEUE_SIZE = 20;
+
+let eventQueue: AnalyticsEvent[] = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+
+const flushEvents = () => {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+
+  const events = eventQueue;
+  eventQueue = [];
+  analyticsAPI.trackEvents(events);
+};
+
+const queueEvent = (event: AnalyticsEvent) => {
+  eventQueue.push(event);
+
+  if (eventQueue.length >= MAX_QUEUE_SIZE) {
+    flushEvents();
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flushEvents, FLUSH_DELAY_MS);
+  }
+};
+
 export function useAnalytics() {
   const sessionId = getSessionId();
 
-  const trackPageView = useCallback(async () => {
+  const trackPageView = useCallback(() => {
     if (typeof window === 'undefined') return;
 
     // Only track minimal page view - no extra metadata to save storage
-    await analyticsAPI.trackEvent({
+    queueEvent({
       session_id: sessionId,
       event_type: 'page_view',
       page_path: window.location.pathname,
@@ -30,13 +58,39 @@ export function useAnalytics() {
     });
   }, [sessionId]);
 
+  const trackSectionView = useCallback((sectionName: string) => {
+    if (typeof window === 'undefined') return;
+
+    queueEvent({
+      session_id: sessionId,
+      event_type: 'section_view',
+      section_name: sectionName,
+    });
+  }, [sessionId]);
+
   // Track page view on mount
   useEffect(() => {
     trackPageView();
   }, [trackPageView]);
 
+  // Flush pending events when the page is hidden or unloaded
+  useEffect(() => {
+    const handleVisibilityChange = () => {
+      if (document.visibilityState === 'hidden') flushEvents();
+    };
+
+    document.addEventListener('visibilitychange', handleVisibilityChange);
+    window.addEventListener('pagehide', flushEvents);
+
+    return () => {
+      document.removeEventListener('visibilitychange', handleVisibilityChange);
+      window.removeEventListener('pagehide', flushEvents);
+    };
+  }, []);
+
   return {
     trackPageView,
+    trackSectionView,
     sessionId,
   };
 }
@@ -45,19 +45,60 @@ export interface ContactFormData {
 }
 
 // Chat API
+const MAX_SEND_ATTEMPTS = 3;
+const RETRYABLE_STATUSES = [502, 503, 504];
+const MAX_RETRY_DELAY_MS = 10000;
+
+// crypto.randomUUID is only available in secure contexts (HTTPS/localhost)
+const newIdempotencyKey = (): string => {
+  if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+};
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+// Honour Retry-After (seconds) when the backend sheds load, else back off
+const retryDelayMs = (response: Response | null, attempt: number): number => {
+  const retryAfter = Number(response?.headers.get('Retry-After'));
+  const delay = retryAfter > 0 ? retryAfter * 1000 : attempt * 1000;
+  return Math.min(delay, MAX_RETRY_DELAY_MS);
+};
+
 export const chatAPI = {
+  // Each user message gets one idempotency key, reused on every retry, so
+  // the backend returns the original reply instead of running the turn twice.
   sendMessage: async (data: ChatMessage): Promise<ChatResponse> => {
-    const response = await fetch(`${API_BASE_URL}/api/chat/message`, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify(data),
-    });
-    
-    if (!response.ok) {
-      throw new Error('Failed to send message');
+    const idempotencyKey = newIdempotencyKey();
+
+    for (let attempt = 1; ; attempt++) {
+      let response: Response | null = null;
+      try {
+        response = await fetch(`${API_BASE_URL}/api/chat/message`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+            'Idempotency-Key': idempotencyKey,
+          },
+          body: JSON.stringify(data),
+        });
+      } catch (error) {
+        // Network error: the request may or may not have reached the server
+        if (attempt >= MAX_SEND_ATTEMPTS) throw error;
+      }
+
+      if (response?.ok) {
+        return response.json();
+      }
+
+      const retryable = response === null || RETRYABLE_STATUSES.includes(response.status);
+      if (!retryable || attempt >= MAX_SEND_ATTEMPTS) {
+        throw new Error('Failed to send message');
+      }
+
+      await sleep(retryDelayMs(response, attempt));
     }
-    
-    return response.json();
   },
   
   getHistory: async (sessionId: string) => {
@@ -85,6 +126,30 @@ export const analyticsAPI = {
     }
   },
   
+  // Sends a batch in one request. sendBeacon posts as text/plain (no CORS
+  // preflight) and survives page unload; fall back to a keepalive fetch.
+  trackEvents: async (events: AnalyticsEvent[]) => {
+    if (events.length === 0) return;
+
+    const url = `${API_BASE_URL}/api/analytics/track/batch`;
+    const body = JSON.stringify(events);
+
+    try {
+      if (typeof navigator !== 'undefined' && navigator.sendBeacon?.(url, body)) {
+        return;
+      }
+
+      await fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'text/plain' },
+        body,
+        keepalive: true,
+      });
+    } catch (error) {
+      console.error('Analytics tracking error:', error);
+    }
+  },
+  
   getStats: async () => {
     const response = await fetch(`${API_BASE_URL}/api/analytics/stats`);
     